@@ -1,9 +1,9 @@
 # Pyramid Architecture: Level 3 - The Workers (MCP Activities)
 from .mcp_comms import CommsMCP, send_email, send_sms
-from .mcp_encompass import EncompassMCP, create_loan_file, push_field_update
+from .mcp_encompass import EncompassMCP, CreateLoanFileArgs, create_loan_file, push_field_update
 
 # Import original activities from the moved file
-from .legacy import analyze_document, read_pdf_content, send_email_mock, organize_files
+from .legacy import aggregate_analyses, analyze_document, analyze_documents_batch, extract_credit_score, read_pdf_content, send_email_mock, organize_files
 
 # Database Activities (Waiter Pattern Wiring)
 from .db import (
@@ -20,12 +20,16 @@ __all__ = [
     # New MCPs
     "CommsMCP",
     "EncompassMCP",
+    "CreateLoanFileArgs",
     "send_email",
     "send_sms",
     "create_loan_file",
     "push_field_update",
     # Legacy Activities
+    "aggregate_analyses",
     "analyze_document",
+    "analyze_documents_batch",
+    "extract_credit_score",
     "read_pdf_content",
     "send_email_mock",
     "organize_files",
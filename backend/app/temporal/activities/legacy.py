@@ -1,8 +1,15 @@
 import os
 import json
 import asyncio
+import functools
+import hashlib
+import multiprocessing
 import re  # <--- NEW: Add this import!
-from dataclasses import dataclass
+import time
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Optional
 from temporalio import activity
 from temporalio.exceptions import ApplicationError
 from openai import AsyncOpenAI
@@ -21,6 +28,18 @@ class LoanData:
         if self.missing_docs is None:
             self.missing_docs = []
 
+@dataclass(slots=True)
+class AnalysisResult:
+    """Lead Capture income analysis, built once by aggregate_analyses"""
+    verified_income: int
+    pay_stub_income: int
+    tax_income: int
+    stated_income: int
+    income_mismatch: bool
+    confidence: float
+    extracted_name: Optional[str]
+    credit_score: int = 0
+
 @activity.defn
 async def organize_files(applicant_name: str, file_paths: dict) -> dict:
     activity.logger.info(f"📂 File Clerk starting for: {applicant_name}")
@@ -53,12 +72,49 @@ async def organize_files(applicant_name: str, file_paths: dict) -> dict:
     
     return new_paths
 
+async def _with_heartbeat(coro, interval: float = 10):
+    """Await coro while heartbeating, so a hung LLM call trips heartbeat_timeout"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval)
+            if done:
+                return task.result()
+            activity.heartbeat()
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+# In-process LRU of serialized analyses (functools.lru_cache can't wrap a coroutine)
+ANALYSIS_MEMO_SIZE = 128
+_analysis_memo: OrderedDict[str, str] = OrderedDict()
+
+def _remember_analysis(key: str, serialized: str) -> None:
+    _analysis_memo[key] = serialized
+    _analysis_memo.move_to_end(key)
+    if len(_analysis_memo) > ANALYSIS_MEMO_SIZE:
+        _analysis_memo.popitem(last=False)
+
 @activity.defn
 async def analyze_document(document_text: str, role: str = "general_analyst") -> LoanData:
     base_url = os.getenv("LITELLM_BASE_URL")
     api_key = os.getenv("LITELLM_API_KEY") or os.getenv("OPENAI_API_KEY")
     model = "gpt-5-nano" # Or os.getenv("LITELLM_MODEL")
 
+    # Byte-identical text for the same role/model gets the same answer
+    # (temperature 0), so re-submissions skip the LLM round trip
+    text_hash = hashlib.sha256(document_text.encode()).hexdigest()
+    cache_key = f"{text_hash}.{model}.{role}"
+    cached = _analysis_memo.get(cache_key)
+    cache_path = None
+    if cached is None and ANALYSIS_CACHE_DIR:
+        cache_path = os.path.join(ANALYSIS_CACHE_DIR, f"{cache_key}.json")
+        cached = _read_cache_file(cache_path)
+    if cached is not None:
+        activity.logger.info(f"Analysis cache hit for {role}")
+        _remember_analysis(cache_key, cached)
+        return LoanData(**json.loads(cached))
+
     print(f"\n🕵️ CONNECTION DEBUG REPORT:")
     print(f"   -> TARGET URL: '{base_url}'")
     print(f"   -> API KEY: '{api_key[:5]}...{api_key[-4:] if api_key else 'NONE'}'")
@@ -99,14 +155,14 @@ async def analyze_document(document_text: str, role: str = "general_analyst") ->
     )
 
     try:
-        response = await client.chat.completions.create(
+        response = await _with_heartbeat(client.chat.completions.create(
             model="gpt-5-nano",
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Analyze this text: {document_text}"}
             ],
             temperature=0,
-        )
+        ))
 
         content = response.choices[0].message.content
         print(f"DEBUG: ({role}) Raw LLM Response: '{content}'")
@@ -133,34 +189,274 @@ async def analyze_document(document_text: str, role: str = "general_analyst") ->
             try: return int(val)
             except: return 0
 
-        return LoanData(
+        result = LoanData(
             applicant_name=data.get("applicant_name") or "Unknown",
             annual_income=to_int(data.get("annual_income")),
             credit_score=to_int(data.get("credit_score")),
             missing_docs=data.get("missing_docs") or []
         )
+        serialized = json.dumps(asdict(result))
+        _remember_analysis(cache_key, serialized)
+        if cache_path:
+            _write_cache_file(cache_path, serialized)
+        return result
     except json.JSONDecodeError as e:
          raise ApplicationError("Invalid JSON from LLM", non_retryable=False)
 
+# Extracted text and analyses hold applicant PII (SSNs, income), so they are
+# cached in process memory only. A disk layer, shared across workers and
+# restarts, is opt-in: set an absolute directory and entries expire after
+# CACHE_TTL_SECONDS.
+def _cache_dir(env_var: str) -> Optional[str]:
+    path = os.getenv(env_var)
+    if path and not os.path.isabs(path):
+        print(f"{env_var} must be an absolute path, disk cache disabled: {path}")
+        return None
+    return path or None
+
+PDF_CACHE_DIR = _cache_dir("PDF_CACHE_DIR")
+ANALYSIS_CACHE_DIR = _cache_dir("ANALYSIS_CACHE_DIR")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 24 * 60 * 60))
+
+def _read_cache_file(cache_path: str) -> Optional[str]:
+    """Return a cached entry, or None when missing or older than the TTL (expired entries are removed)"""
+    try:
+        if time.time() - os.path.getmtime(cache_path) > CACHE_TTL_SECONDS:
+            os.remove(cache_path)
+            return None
+        with open(cache_path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+_last_purge: dict[str, float] = {}
+
+def _purge_expired(cache_dir: str) -> None:
+    """Drop expired entries nobody asked for again, so the directory doesn't grow forever"""
+    cutoff = time.time() - CACHE_TTL_SECONDS
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+    except OSError as e:
+        print(f"Cache cleanup skipped for {cache_dir}: {e}")
+
+def _write_cache_file(cache_path: str, text: str) -> None:
+    # Write to a temp file then rename so readers never see a partial entry.
+    # The cache is best-effort: an unwritable cache dir must not fail the activity.
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        # Owner-only: entries contain applicant PII
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Cache write skipped for {cache_path}: {e}")
+        return
+    # Sweep each directory at most hourly per process
+    now = time.time()
+    if now - _last_purge.get(cache_dir, 0.0) > 3600:
+        _last_purge[cache_dir] = now
+        _purge_expired(cache_dir)
+
+def _parse_pdf_bytes(data: bytes) -> str:
+    # PyMuPDF parses content streams in C; pypdf dispatches every operator in Python
+    import fitz
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        text = "\n".join(page.get_text("text") for page in doc)
+
+    return text[:5000] # Cap text to avoid token limits for this MVP
+
+@functools.lru_cache(maxsize=128)
+def _cached_pdf_text(file_path: str, mtime: float, size: int) -> str:
+    """In-process layer: (path, mtime, size) hit avoids even hashing the file; the disk layer is opt-in"""
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    if not PDF_CACHE_DIR:
+        return _parse_pdf_bytes(data)
+
+    key = hashlib.sha256(data).hexdigest()
+    cache_path = os.path.join(PDF_CACHE_DIR, f"{key}.fitz.txt")
+    text = _read_cache_file(cache_path)
+    if text is None:
+        text = _parse_pdf_bytes(data)
+        _write_cache_file(cache_path, text)
+    return text
+
+def _extract_pdf_text(file_path: str) -> str:
+    """Blocking PDF text extraction shared by the read activities"""
+    # Verify file exists
+    if not os.path.exists(file_path):
+         raise ApplicationError(f"File not found: {file_path}", non_retryable=True)
+
+    stat = os.stat(file_path)
+    return _cached_pdf_text(file_path, stat.st_mtime, stat.st_size)
+
+@functools.cache
+def _pdf_pool() -> ProcessPoolExecutor:
+    """
+    Started by worker._warm_up (or on first use), never at import, so the API
+    process doesn't get one. Children come from a forkserver: forking the
+    multithreaded worker process directly can deadlock them on locks held by
+    other threads. The forkserver preloads PyMuPDF once for every child.
+    """
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["fitz"])
+    return ProcessPoolExecutor(
+        max_workers=int(os.getenv("PDF_WORKERS", os.cpu_count() or 1)),
+        mp_context=context,
+    )
+
+def _shutdown_pdf_pool() -> None:
+    """Stop the PDF pool's child processes if it was started (worker exit)"""
+    if _pdf_pool.cache_info().currsize:
+        _pdf_pool().shutdown(cancel_futures=True)
+        _pdf_pool.cache_clear()
+
+async def _extract_pdf_text_async(file_path: str) -> str:
+    """Parse in the process pool: CPU-bound parsing of several PDFs isn't serialized by the GIL"""
+    pool = _pdf_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, _extract_pdf_text, file_path)
+    except BrokenExecutor:
+        # A child died (OOM-kill, PyMuPDF segfault) and the executor is unusable
+        # for good: drop it so the activity retry gets a fresh pool. Concurrent
+        # callers on the same dead pool only replace it once.
+        if _pdf_pool.cache_info().currsize and _pdf_pool() is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            _pdf_pool.cache_clear()
+        raise
+
 @activity.defn
 async def read_pdf_content(file_path: str) -> str:
     activity.logger.info(f"Reading PDF from {file_path}")
     try:
-        from pypdf import PdfReader
-        
-        # Verify file exists
-        if not os.path.exists(file_path):
-             raise ApplicationError(f"File not found: {file_path}", non_retryable=True)
-
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        
-        return text[:5000] # Cap text to avoid token limits for this MVP
+        return await _extract_pdf_text_async(file_path)
+    except BrokenExecutor:
+        # Pool was rebuilt; a retry can succeed
+        raise
     except Exception as e:
         raise ApplicationError(f"Failed to read PDF: {e}", non_retryable=True)
 
+@activity.defn
+async def analyze_documents_batch(documents: list[dict]) -> list[Optional[LoanData]]:
+    """
+    Read and analyze several documents in one activity.
+    documents: [{"path": str, "role": str}, ...]
+    Returns one LoanData per document, or None where that document can't be
+    analyzed (missing or unreadable file, non-retryable analysis error), so one
+    bad file doesn't fail the others. Transient failures (LLM/network errors,
+    malformed LLM output) fail the batch so the activity is retried.
+    """
+    # Applicants often upload the same file (or identical scans) for two slots:
+    # documents with the same text and role share one LLM call
+    analyses: dict[tuple[bytes, str], asyncio.Future] = {}
+
+    async def read_and_analyze(doc: dict) -> Optional[LoanData]:
+        try:
+            # PDF parsing runs off the event loop; overlap it with other documents' LLM calls
+            text = await _extract_pdf_text_async(doc["path"])
+        except BrokenExecutor:
+            # Pool died (worker crash/OOM) and was rebuilt: let the activity retry
+            raise
+        except (ApplicationError, OSError, RuntimeError, ValueError) as e:
+            # Missing file, or PyMuPDF rejecting a corrupt one: won't read on retry
+            activity.logger.warning(f"Batch read failed for {doc.get('path')}: {e}")
+            return None
+
+        role = doc.get("role", "general_analyst")
+        key = (hashlib.blake2b(text.encode(), digest_size=16).digest(), role)
+        if key not in analyses:
+            analyses[key] = asyncio.ensure_future(analyze_document(text, role))
+        else:
+            activity.logger.info(f"Reusing analysis of identical text for {doc['path']}")
+        try:
+            return await analyses[key]
+        except ApplicationError as e:
+            if not e.non_retryable:
+                raise
+            activity.logger.warning(f"Batch analysis failed for {doc.get('path')}: {e}")
+            return None
+
+    activity.logger.info(f"Batch analyzing {len(documents)} documents")
+    return list(await asyncio.gather(*(read_and_analyze(doc) for doc in documents)))
+
+# "Credit Score: 712" / "CREDIT SCORE - 712" as printed on bureau reports
+_CREDIT_SCORE_RE = re.compile(r"credit\s*score\s*[:\-]?\s*(\d{3})\b", re.IGNORECASE)
+# Bounds of the FICO range: "Credit Score: 300-850 scale" legends match the
+# pattern too, so these values are never trusted without the LLM
+_SCORE_SCALE_BOUNDS = {300, 850}
+
+@activity.defn
+async def extract_credit_score(document_text: str) -> Optional[int]:
+    """
+    Cheap regex pre-check for the score on a credit report, so clear rejects
+    skip the LLM analysts. Returns None when no score is printed, when the
+    report shows several different scores (e.g. a prior score), or when the
+    only match is a scale bound; the workflow then falls through to the LLM.
+    """
+    scores = {int(score) for score in _CREDIT_SCORE_RE.findall(document_text)}
+    if len(scores) != 1:
+        return None
+    score = scores.pop()
+    return None if score in _SCORE_SCALE_BOUNDS else score
+
+@activity.defn
+async def aggregate_analyses(analyses: dict[str, Optional[LoanData]], stated_income: int) -> AnalysisResult:
+    """
+    Combine per-document income analyses into the Lead Capture analysis result.
+    analyses: {"pay_stub": LoanData | None, "tax_document": LoanData | None}, one
+    entry per submitted document, None where that document's analysis failed.
+    Pure CPU, so workflows run it as a local activity.
+    """
+    confidences = []
+    extracted_name = None
+    for doc_type, analysis in analyses.items():
+        if analysis is None:
+            activity.logger.warning(f"Analysis failed for {doc_type}")
+            confidences.append(0.5)
+            continue
+        activity.logger.info(f"Analysis complete for {doc_type}: income={analysis.annual_income}")
+
+        # Capture the extracted data (tax return name wins if both present)
+        if analysis.applicant_name and analysis.applicant_name != "Unknown":
+            extracted_name = analysis.applicant_name
+
+        # Confidence based on whether income was extracted
+        confidences.append(0.9 if analysis.annual_income > 0 else 0.3)
+
+    pay_analysis = analyses.get("pay_stub")
+    tax_analysis = analyses.get("tax_document")
+    pay_stub_income = (pay_analysis.annual_income or 0) if pay_analysis else 0
+    tax_income = (tax_analysis.annual_income or 0) if tax_analysis else 0
+
+    # Use the highest extracted income (more reliable)
+    verified_income = max(pay_stub_income, tax_income)
+
+    # Flag a mismatch if the difference is > 20%
+    comparable = verified_income > 0 and stated_income > 0
+    income_mismatch = comparable and abs(verified_income - stated_income) > 0.20 * stated_income
+    if comparable:
+        activity.logger.info(f"Income comparison: stated={stated_income}, verified={verified_income}, mismatch={income_mismatch}")
+
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+
+    return AnalysisResult(
+        verified_income=verified_income,
+        pay_stub_income=pay_stub_income,
+        tax_income=tax_income,
+        stated_income=stated_income,
+        income_mismatch=income_mismatch,
+        confidence=round(avg_confidence, 2),
+        extracted_name=extracted_name,
+    )
+
 @activity.defn
 async def send_email_mock(applicant_name: str, status: str) -> str:
     activity.logger.info(f"Sending email to {applicant_name}: {status}")
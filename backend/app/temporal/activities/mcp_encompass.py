@@ -11,6 +11,7 @@ This is a mock implementation with print logs for development.
 In production, integrate with Encompass API via ICE Mortgage Technology SDK.
 """
 from dataclasses import dataclass
+from typing import Any
 from temporalio import activity
 from datetime import datetime
 import uuid
@@ -21,29 +22,63 @@ from app.core.database import engine
 from app.models.sql import Application
 
 
+@dataclass(slots=True)
+class CreateLoanFileArgs:
+    """Input for the create_loan_file activity"""
+    applicant_name: str
+    email: str
+    stated_income: Any  # Raw form value: number or string like "$85,000"
+    idempotency_key: str = ""  # Workflow ID; repeat calls return the same file
+
+
+class DuplicateLoanFileError(Exception):
+    """Raised by the LOS when a loan file already exists for an idempotency key"""
+
+    def __init__(self, loan_number: str):
+        super().__init__(f"Loan file already exists: {loan_number}")
+        self.loan_number = loan_number
+
+
+# Mock LOS-side dedupe index: idempotency_key -> loan_number. Mock only: the
+# real LOS keeps this server-side. Bounded (oldest keys dropped first) since
+# a key only matters while its Lead Capture activity may still be retried.
+_LOAN_FILES_BY_KEY: dict[str, str] = {}
+_LOAN_FILES_MAX_KEYS = 10_000
+
+
 @dataclass
 class EncompassMCP:
     """Encompass MCP - handles LOS operations"""
 
     @staticmethod
-    def create_loan_file(data: dict) -> dict:
+    def create_loan_file(data: CreateLoanFileArgs) -> dict:
         """
         Create a new loan file in Encompass LOS.
 
         Args:
-            data: Loan application data including applicant info
+            data: Applicant details for the new loan file
 
         Returns:
             Dict with loan_number and status
+
+        Raises:
+            DuplicateLoanFileError: If a file already exists for data.idempotency_key
         """
         timestamp = datetime.utcnow().isoformat()
+        if data.idempotency_key in _LOAN_FILES_BY_KEY:
+            raise DuplicateLoanFileError(_LOAN_FILES_BY_KEY[data.idempotency_key])
+
         # Generate a mock Encompass loan number
         loan_number = f"ENC-{uuid.uuid4().hex[:8].upper()}"
+        if data.idempotency_key:
+            _LOAN_FILES_BY_KEY[data.idempotency_key] = loan_number
+            if len(_LOAN_FILES_BY_KEY) > _LOAN_FILES_MAX_KEYS:
+                del _LOAN_FILES_BY_KEY[next(iter(_LOAN_FILES_BY_KEY))]
 
         print(f"[EncompassMCP] [{timestamp}] LOAN FILE CREATED")
         print(f"  Loan Number: {loan_number}")
-        print(f"  Applicant: {data.get('applicant_name', 'Unknown')}")
-        print(f"  Data Keys: {list(data.keys())}")
+        print(f"  Applicant: {data.applicant_name}")
+        print(f"  Email: {data.email or 'N/A'}")
 
         return {
             "loan_number": loan_number,
@@ -77,9 +112,22 @@ class EncompassMCP:
 # =========================================
 
 @activity.defn
-async def create_loan_file(data: dict) -> dict:
-    """Temporal Activity: Create loan file via EncompassMCP"""
-    return EncompassMCP.create_loan_file(data)
+async def create_loan_file(data: CreateLoanFileArgs) -> dict:
+    """
+    Temporal Activity: Create loan file via EncompassMCP
+
+    A retry after a timed-out call that actually succeeded hits the LOS
+    dedupe and is treated as success with the existing loan number.
+    """
+    try:
+        return EncompassMCP.create_loan_file(data)
+    except DuplicateLoanFileError as e:
+        activity.logger.info(f"Loan file already exists for {data.idempotency_key}: {e.loan_number}")
+        return {
+            "loan_number": e.loan_number,
+            "status": "Existing",
+            "created_at": None
+        }
 
 
 @activity.defn
@@ -16,6 +16,38 @@ from dataclasses import dataclass
 from temporalio import activity
 from datetime import datetime
 
+# _score issue flags
+LOAN_LIMIT_EXCEEDED = 1
+CREDIT_TOO_LOW = 2
+DTI_TOO_HIGH = 4
+
+
+def _score(credit_score, loan_amount, monthly_income):
+    """
+    Numeric core of the risk rules.
+
+    Args:
+        credit_score: Borrower credit score
+        loan_amount: Requested loan amount
+        monthly_income: Verified monthly income
+
+    Returns:
+        Tuple of (issue flag bitmask, DTI ratio in percent)
+    """
+    # Calculate DTI (Debt-to-Income) - simplified mock
+    # Assume monthly loan payment is ~0.5% of loan amount (rough approximation)
+    monthly_payment = loan_amount * 0.005
+    dti_ratio = (monthly_payment / monthly_income) * 100 if monthly_income > 0 else 100.0
+
+    flags = 0
+    if loan_amount >= 1000000:
+        flags |= LOAN_LIMIT_EXCEEDED
+    if credit_score <= 700:
+        flags |= CREDIT_TOO_LOW
+    if dti_ratio > 43:
+        flags |= DTI_TOO_HIGH
+    return flags, dti_ratio
+
 
 @dataclass
 class UnderwritingMCP:
@@ -84,11 +116,8 @@ class UnderwritingMCP:
             # Map confidence to credit score range (650-800)
             credit_score = int(650 + (confidence * 150))
 
-        # Calculate DTI (Debt-to-Income) - simplified mock
-        # Assume monthly loan payment is ~0.5% of loan amount (rough approximation)
-        monthly_payment = loan_amount * 0.005
         monthly_income = verified_income / 12 if verified_income > 0 else 1
-        dti_ratio = (monthly_payment / monthly_income) * 100 if monthly_income > 0 else 100
+        flags, dti_ratio = _score(int(credit_score), loan_amount, float(monthly_income))
 
         print(f"[UnderwritingMCP] [{timestamp}] RISK EVALUATION")
         print(f"  Loan Amount: ${loan_amount:,.2f}")
@@ -100,13 +129,13 @@ class UnderwritingMCP:
         # Evaluate against criteria
         issues = []
 
-        if loan_amount >= 1000000:
+        if flags & LOAN_LIMIT_EXCEEDED:
             issues.append(f"Loan amount ${loan_amount:,.0f} exceeds $1M limit")
 
-        if credit_score <= 700:
+        if flags & CREDIT_TOO_LOW:
             issues.append(f"Credit score {credit_score} below 700 threshold")
 
-        if dti_ratio > 43:
+        if flags & DTI_TOO_HIGH:
             issues.append(f"DTI ratio {dti_ratio:.1f}% exceeds 43% limit")
 
         if income_mismatch:
@@ -1,10 +1,22 @@
 import asyncio
+import dataclasses
+import math
+from typing import Any, Optional, Type
+from temporalio.api.common.v1 import Payload
 from temporalio.client import Client
+from temporalio.converter import (
+    CompositePayloadConverter,
+    DataConverter,
+    DefaultPayloadConverter,
+    JSONPlainPayloadConverter,
+    value_to_type,
+)
 from temporalio.worker import Worker
 import os
 
 # Original workflow and activities
-from app.temporal.activities import analyze_document, read_pdf_content, send_email_mock, organize_files
+from app.temporal.activities import aggregate_analyses, analyze_document, analyze_documents_batch, extract_credit_score, read_pdf_content, send_email_mock, organize_files
+from app.temporal.activities.legacy import _shutdown_pdf_pool
 from app.temporal.workflows import LoanProcessWorkflow
 
 # Pyramid Architecture: New Workflows (Level 1 & 2)
@@ -28,6 +40,89 @@ from app.temporal.activities.db import (
     get_loan_record,
 )
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _has_non_finite(value: Any) -> bool:
+    """True if value holds a NaN/Infinity float anywhere orjson would encode it"""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(item) for item in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return any(_has_non_finite(getattr(value, field.name)) for field in dataclasses.fields(value))
+    return False
+
+
+class OrjsonPayloadConverter(JSONPlainPayloadConverter):
+    """
+    json/plain converter backed by orjson. Bytes on the wire are still plain
+    JSON, so clients using the default converter (e.g. the API) interoperate.
+
+    Values orjson would encode differently go through the stock encoder:
+    anything it can't encode, dates/times (passed through, since orjson's
+    RFC 3339 output can differ from isoformat) and NaN/Infinity floats (which
+    orjson writes as null). The only remaining difference is that non-ASCII
+    text is written as UTF-8 rather than \\u escapes, which decodes to the same
+    value. Payloads orjson can't parse, such as the stock encoder's NaN
+    tokens, are decoded by the stock decoder.
+    """
+
+    def to_payload(self, value: Any) -> Optional[Payload]:
+        if _has_non_finite(value):
+            return super().to_payload(value)
+        try:
+            data = orjson.dumps(value, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS)
+        except TypeError:
+            return super().to_payload(value)
+        return Payload(metadata={"encoding": self.encoding.encode()}, data=data)
+
+    def from_payload(self, payload: Payload, type_hint: Optional[Type] = None) -> Any:
+        try:
+            obj = orjson.loads(payload.data)
+        except orjson.JSONDecodeError:
+            return super().from_payload(payload, type_hint)
+        if type_hint:
+            obj = value_to_type(type_hint, obj, self._custom_type_converters)
+        return obj
+
+
+class OrjsonCompositePayloadConverter(CompositePayloadConverter):
+    """Default converter chain with json/plain swapped for OrjsonPayloadConverter"""
+
+    def __init__(self) -> None:
+        super().__init__(*(
+            OrjsonPayloadConverter() if isinstance(converter, JSONPlainPayloadConverter) else converter
+            for converter in DefaultPayloadConverter.default_encoding_payload_converters
+        ))
+
+
+def _data_converter() -> DataConverter:
+    if orjson is None:
+        return DataConverter.default
+    return dataclasses.replace(DataConverter.default, payload_converter_class=OrjsonCompositePayloadConverter)
+
+
+def _warm_up():
+    """
+    Start the PDF process pool and parse a blank page in it, so the first real
+    read_pdf_content task pays only for parsing, not for starting the
+    forkserver, spawning a child and loading the parser.
+    """
+    import fitz
+    from app.temporal.activities.legacy import _parse_pdf_bytes, _pdf_pool
+
+    with fitz.open() as doc:
+        doc.new_page()
+        sample = doc.tobytes()
+    _pdf_pool().submit(_parse_pdf_bytes, sample).result()
+
+
 async def main():
     # 1. Connect to the Temporal Server
     # 'localhost:7233' assumes you are running Temporal locally (e.g., via Docker).
@@ -36,19 +131,36 @@ async def main():
     temporal_url = os.getenv("TEMPORAL_HOST", "localhost:7233")
     while True:
         try:
-            client = await Client.connect(temporal_url)
+            # One client (one gRPC channel) is shared by every worker below
+            client = await Client.connect(
+                temporal_url,
+                data_converter=_data_converter(),
+            )
             print(f"Successfully connected to Temporal at {temporal_url}")
             break
         except Exception as e:
             print(f"Failed to connect to Temporal at {temporal_url}, retrying in 5 seconds... Error: {e}")
             await asyncio.sleep(5)
 
-    # 2. Create the Worker
-    # We tell it which "Queue" to listen to, and which functions it is allowed to run.
+    # Warm up before polling; a failure here only costs first-task latency
+    try:
+        await asyncio.to_thread(_warm_up)
+    except Exception as e:
+        print(f"Warm-up skipped: {e}")
+
+    # Slot pools scale with the host's cores (overridable per deployment)
+    cpu_count = os.cpu_count() or 1
+    max_workflow_tasks = int(os.getenv("WORKER_MAX_WORKFLOW_TASKS", max(200, cpu_count * 50)))
+    max_activities = int(os.getenv("WORKER_MAX_ACTIVITIES", max(100, cpu_count * 25)))
+
+    # 2. Create the Workers
+    # We tell each one which "Queue" to listen to, and which functions it is allowed to run.
     # Pyramid Architecture: Register all workflow levels and MCP activities
-    worker = Worker(
+    # TEMPORAL_TASK_QUEUES (comma-separated) lets one process serve several queues.
+    task_queues = os.getenv("TEMPORAL_TASK_QUEUES", "loan-application-queue").split(",")
+    workers = [Worker(
         client,
-        task_queue="loan-application-queue",
+        task_queue=task_queue.strip(),
         workflows=[
             # Original workflow (maintained for backward compatibility)
             LoanProcessWorkflow,
@@ -60,7 +172,10 @@ async def main():
         ],
         activities=[
             # Original activities
+            aggregate_analyses,
             analyze_document,
+            analyze_documents_batch,
+            extract_credit_score,
             read_pdf_content,
             send_email_mock,
             organize_files,
@@ -83,12 +198,31 @@ async def main():
             finalize_loan_record,
             get_loan_record,
         ],
-    )
+        # Workflows here are thin orchestration, so per-task CPU is tiny and
+        # throughput is bound by poll/response latency: run more in parallel.
+        max_concurrent_workflow_tasks=max_workflow_tasks,
+        max_concurrent_activities=max_activities,
+        max_concurrent_workflow_task_polls=10,
+        max_concurrent_activity_task_polls=10,
+    ) for task_queue in task_queues]
 
-    print("Worker started. Listening for tasks on 'loan-application-queue'...")
+    print(f"Worker started. Listening for tasks on {', '.join(w.task_queue for w in workers)}...")
     
     # 3. Keep running indefinitely (until you stop the script)
-    await worker.run()
+    try:
+        await asyncio.gather(*(worker.run() for worker in workers))
+    finally:
+        _shutdown_pdf_pool()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop lowers per-task scheduling overhead for the workflow/activity loop.
+    # Set DISABLE_UVLOOP=1 when profiling (e.g. pyinstrument) or if it's unavailable.
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
+    if uvloop and not os.getenv("DISABLE_UVLOOP"):
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -9,6 +9,8 @@ LEAD_CAPTURE → PROCESSING → UNDERWRITING → CLOSING → ARCHIVED
                     ↓ (if rejected)
                  ARCHIVED
 """
+import asyncio
+import logging
 from datetime import timedelta
 from temporalio import workflow
 from temporalio.common import RetryPolicy
@@ -16,7 +18,7 @@ from temporalio.common import RetryPolicy
 # Import child workflows
 with workflow.unsafe.imports_passed_through():
     from app.models.sql import LoanStage
-    from .managers import LeadCaptureWorkflow, ProcessingWorkflow, UnderwritingWorkflow
+    from .managers import LeadCaptureWorkflow, ProcessingWorkflow, UnderwritingWorkflow, DOC_DEFAULTS
     from app.temporal.activities.mcp_encompass import update_loan_metadata
     from app.temporal.activities.mcp_docgen import generate_document
     from app.temporal.activities.mcp_comms import send_email
@@ -31,6 +33,49 @@ with workflow.unsafe.imports_passed_through():
     )
 
 
+# Forward stage transitions, built once at import and shared by every run.
+# Rejections and timeouts jump straight to ARCHIVED outside this table.
+# Stages are kept as plain LoanStage values so workflow state stays primitive.
+TRANSITIONS: dict[str, str] = {
+    LoanStage.LEAD_CAPTURE.value: LoanStage.PROCESSING.value,
+    LoanStage.PROCESSING.value: LoanStage.UNDERWRITING.value,
+    LoanStage.UNDERWRITING.value: LoanStage.CLOSING.value,
+    LoanStage.CLOSING.value: LoanStage.ARCHIVED.value,
+}
+
+# Continue-as-new at the approval gate once history grows past this many events
+HISTORY_COMPACTION_THRESHOLD = 4000
+# input_data key carrying the state snapshot into the continued run
+RESUME_KEY = "_resume"
+# Lower bar at the end of Processing: a natural phase boundary right before
+# the multi-day underwriting and signature waits
+PHASE_COMPACTION_THRESHOLD = 1000
+
+# Final workflow result -> SQL status written when the loan is archived
+TERMINAL_STATUS: dict[str, str] = {
+    "REJECTED": "Rejected by Underwriter",
+    "WITHDRAWN": "Withdrawn (Timeout)",
+    "COMPLETED": "Funded",
+}
+
+
+async def _run_writes(*writes) -> None:
+    """
+    Run independent status writes concurrently.
+
+    Runs started before the writes were parallelized recorded them one after
+    another, so unpatched histories replay them sequentially.
+
+    Args:
+        writes: Zero-argument callables each returning an activity handle
+    """
+    if workflow.patched("concurrent-status-writes"):
+        await asyncio.gather(*(write() for write in writes))
+    else:
+        for write in writes:
+            await write()
+
+
 @workflow.defn
 class LoanLifecycleWorkflow:
     """
@@ -43,14 +88,20 @@ class LoanLifecycleWorkflow:
     4. Exposing queries for real-time status
     """
 
+    # Set False (e.g. in a subclass for batch backfills or tests) to skip
+    # building the dashboard audit log entirely
+    LOGGING_ENABLED = True
+
     def __init__(self) -> None:
-        self.current_stage = LoanStage.LEAD_CAPTURE
+        self.current_stage = LoanStage.LEAD_CAPTURE.value
         self.decision_reason = None
         self.loan_number = None
         self.logs = []
         # THE GATE: Human decision is tracked at CEO level
         self.human_decision = None
+        self._decided = False  # Gate flag set alongside human_decision
         self.loan_data = {}  # Stores current loan data for field updates
+        self._pending_updates = []  # (field_name, value) pairs awaiting flush
         # Signature Loop: Track borrower signature
         self.borrower_signed = False
 
@@ -68,13 +119,48 @@ class LoanLifecycleWorkflow:
         # Database record ID (from LoanApplication table)
         self.db_record_id = None
 
+    def _flush_field_updates(self):
+        """Apply buffered update_field signals to loan_data in one batch"""
+        if not self._pending_updates:
+            return
+        applicant_info = self.loan_data.setdefault("applicant_info", {})
+        for field_name, value in self._pending_updates:
+            # Handle nested applicant_info fields
+            if field_name in ["name", "email", "ssn", "stated_income"]:
+                applicant_info[field_name] = value
+            else:
+                self.loan_data[field_name] = value
+        self._pending_updates.clear()
+
+    def _resume_snapshot(self, phase: str, analysis: dict) -> dict:
+        """Compact state carried into a continued-as-new run (under RESUME_KEY)"""
+        self._flush_field_updates()
+        return {
+            "phase": phase,
+            "db_record_id": self.db_record_id,
+            "loan_number": self.loan_number,
+            "loan_data": self.loan_data,
+            "logs": self.logs,
+            "analysis": analysis,
+            "human_decision": self.human_decision,
+            "current_stage": self.current_stage,
+            "borrower_signed": self.borrower_signed,
+            "underwriting": [
+                self.is_underwriting_complete,
+                self.underwriting_decision,
+                self.underwriting_decision_reason,
+            ],
+        }
+
     def _add_log(self, agent: str, message: str):
         """Add an audit log entry"""
+        if not self.LOGGING_ENABLED:
+            return
         entry = {
             "agent": agent,
             "message": message,
             "timestamp": workflow.now().isoformat(),
-            "stage": self.current_stage.value
+            "stage": self.current_stage
         }
         self.logs.append(entry)
 
@@ -89,20 +175,21 @@ class LoanLifecycleWorkflow:
         THE GATE: This is where human decisions are received.
         """
         self.human_decision = "APPROVED" if approved else "REJECTED"
-        workflow.logger.info(f"CEO received human decision: {self.human_decision}")
+        self._decided = True
+        workflow.logger.info("CEO received human decision: %s", self.human_decision)
 
     @workflow.signal
     def update_field(self, field_name: str, value):
-        """Signal handler for real-time field updates from manager dashboard"""
-        if "applicant_info" not in self.loan_data:
-            self.loan_data["applicant_info"] = {}
-
-        # Handle nested applicant_info fields
-        if field_name in ["name", "email", "ssn", "stated_income"]:
-            self.loan_data["applicant_info"][field_name] = value
-        else:
-            self.loan_data[field_name] = value
-        workflow.logger.info(f"CEO: Manager updated {field_name} to {value}")
+        """
+        Signal handler for real-time field updates from manager dashboard.
+        Updates are buffered and flushed into loan_data right before the
+        next phase reads it, so a burst of edits is applied once and edits
+        made while Lead Capture is still running are not overwritten.
+        """
+        self._pending_updates.append((field_name, value))
+        # Fires on every dashboard edit; skip the adapter/record work when INFO is off
+        if workflow.logger.isEnabledFor(logging.INFO):
+            workflow.logger.info("CEO: Manager updated %s to %s", field_name, value)
 
     @workflow.signal
     def borrower_signature(self, signed: bool):
@@ -111,7 +198,7 @@ class LoanLifecycleWorkflow:
         Called when borrower signs Initial Disclosures.
         """
         self.borrower_signed = signed
-        workflow.logger.info(f"CEO received borrower signature: {signed}")
+        workflow.logger.info("CEO received borrower signature: %s", signed)
 
     @workflow.signal
     def submit_underwriting_decision(self, approved: bool, reason: str):
@@ -126,7 +213,7 @@ class LoanLifecycleWorkflow:
         self.underwriting_decision = "approved" if approved else "rejected"
         self.underwriting_decision_reason = reason
         self.is_underwriting_complete = True
-        workflow.logger.info(f"CEO received underwriting decision: {self.underwriting_decision} - {reason}")
+        workflow.logger.info("CEO received underwriting decision: %s - %s", self.underwriting_decision, reason)
 
     # =========================================
     # Queries - Expose live status
@@ -135,7 +222,7 @@ class LoanLifecycleWorkflow:
     @workflow.query
     def get_current_stage(self) -> str:
         """Query the current loan stage"""
-        return self.current_stage.value
+        return self.current_stage
 
     @workflow.query
     def get_loan_number(self) -> str:
@@ -173,6 +260,7 @@ class LoanLifecycleWorkflow:
 
         Args:
             input_data: Dict containing applicant_info, file_paths, etc.
+                When continued-as-new, also carries a RESUME_KEY snapshot.
 
         Returns:
             Final status: "APPROVED", "REJECTED", or "COMPLETED"
@@ -183,127 +271,183 @@ class LoanLifecycleWorkflow:
         property_value = input_data.get("property_value", 0)
         down_payment = input_data.get("down_payment", 0)
 
-        workflow.logger.info(f"CEO Workflow started for {applicant_name}")
-        self._add_log("CEO", f"Loan lifecycle initiated for {applicant_name}")
-
-        # =========================================
-        # Initialize Database Record (Waiter Pattern Wiring)
-        # =========================================
-        self.db_record_id = await workflow.execute_activity(
-            init_loan_record,
-            args=[
-                workflow.info().workflow_id,
-                applicant_name,
-                applicant_email,
-                loan_amount,
-                property_value,
-                down_payment
-            ],
-            start_to_close_timeout=timedelta(seconds=30)
-        )
-        workflow.logger.info(f"Database record created: {self.db_record_id}")
-        self._add_log("Database", f"Loan record initialized (ID: {self.db_record_id[:8]}...)")
-
-        # =========================================
-        # Phase 1: Lead Capture
-        # =========================================
-        self.current_stage = LoanStage.LEAD_CAPTURE
-        self._add_log("CEO", "Delegating to Lead Capture Department")
-
-        lead_capture_result = await workflow.execute_child_workflow(
-            LeadCaptureWorkflow.run,
-            args=[input_data],
-            id=f"{workflow.info().workflow_id}-lead-capture",
-            retry_policy=RetryPolicy(maximum_attempts=1)
-        )
-
-        # Extract recommendation and loan_data from LeadCapture result
-        ai_recommendation = lead_capture_result.get("recommendation", "PENDING_REVIEW")
-        self.loan_data = lead_capture_result.get("loan_data", input_data)
-        self.loan_number = lead_capture_result.get("loan_number")
-        analysis_result = lead_capture_result.get("analysis", {})
-
-        workflow.logger.info(f"Lead Capture completed with AI recommendation: {ai_recommendation}")
-        self._add_log("Lead Capture", f"Phase completed. AI Recommendation: {ai_recommendation}")
-
-        # Persist analysis results to SQL for frontend display
-        if analysis_result:
-            metadata_update = {
-                "analysis": analysis_result,
-                "ai_recommendation": ai_recommendation,
-                "loan_number": self.loan_number
-            }
-            await workflow.execute_activity(
-                update_loan_metadata,
-                args=[workflow.info().workflow_id, metadata_update],
+        # Set when this run was continued-as-new at the approval gate or
+        # after Processing ("phase" says which)
+        resume = input_data.get(RESUME_KEY)
+        phase = resume.get("phase", "approval") if resume else None
+
+        if resume:
+            self.db_record_id = resume["db_record_id"]
+            self.loan_number = resume["loan_number"]
+            self.loan_data = resume["loan_data"]
+            self.logs = resume["logs"]
+            analysis_result = resume["analysis"]
+            if phase == "underwriting":
+                self.human_decision = resume["human_decision"]
+                self._decided = True
+                self.current_stage = resume["current_stage"]
+                # Signals may have landed before the handoff; never drop them
+                self.borrower_signed = self.borrower_signed or resume["borrower_signed"]
+                if not self.is_underwriting_complete:
+                    (self.is_underwriting_complete,
+                     self.underwriting_decision,
+                     self.underwriting_decision_reason) = resume["underwriting"]
+                self._add_log("CEO", "History compacted - resumed after Processing")
+            else:
+                self._add_log("CEO", "History compacted - resumed at human approval gate")
+        else:
+            workflow.logger.info("CEO Workflow started for %s", applicant_name)
+            self._add_log("CEO", f"Loan lifecycle initiated for {applicant_name}")
+
+            # =========================================
+            # Initialize Database Record (Waiter Pattern Wiring)
+            # =========================================
+            self.db_record_id = await workflow.execute_activity(
+                init_loan_record,
+                args=[
+                    workflow.info().workflow_id,
+                    applicant_name,
+                    applicant_email,
+                    loan_amount,
+                    property_value,
+                    down_payment
+                ],
                 start_to_close_timeout=timedelta(seconds=30)
             )
-            workflow.logger.info("Analysis results persisted to SQL")
-            self._add_log("CEO", f"AI Analysis: verified_income=${analysis_result.get('verified_income', 0):,}, mismatch={analysis_result.get('income_mismatch', False)}")
-
-        self._add_log("CEO", "Waiting for human approval...")
-
-        # =========================================
-        # THE GATE: Wait for human approval signal
-        # This is the ONLY place where we wait for human decision
-        # =========================================
-        workflow.logger.info("CEO: Waiting for human approval signal...")
-        await workflow.wait_condition(lambda: self.human_decision is not None)
-
-        workflow.logger.info(f"CEO received human decision: {self.human_decision}")
-        self._add_log("Human Manager", f"Decision: {self.human_decision}")
-
-        # Check: If rejected, archive and end
-        if self.human_decision == "REJECTED":
-            self.current_stage = LoanStage.ARCHIVED
-            self.decision_reason = "Rejected by human manager"
-            self._add_log("CEO", "Application REJECTED - Moving to Archive")
-            return "REJECTED"
+            workflow.logger.info("Database record created: %s", self.db_record_id)
+            self._add_log("Database", f"Loan record initialized (ID: {self.db_record_id[:8]}...)")
+
+            # =========================================
+            # Phase 1: Lead Capture
+            # =========================================
+            self.current_stage = LoanStage.LEAD_CAPTURE.value
+            self._add_log("CEO", "Delegating to Lead Capture Department")
+
+            lead_capture_result = await workflow.execute_child_workflow(
+                LeadCaptureWorkflow.run,
+                args=[input_data],
+                id=f"{workflow.info().workflow_id}-lead-capture",
+                retry_policy=RetryPolicy(maximum_attempts=1)
+            )
 
-        # =========================================
-        # Phase 2: Processing (Transition on Approval)
-        # Pass the loan_data (includes any manager field updates)
-        # =========================================
-        self.current_stage = LoanStage.PROCESSING
-        self._add_log("CEO", "Human APPROVED - Delegating to Processing Department")
+            # Extract recommendation and loan_data from LeadCapture result
+            ai_recommendation = lead_capture_result.get("recommendation", "PENDING_REVIEW")
+            self.loan_data = lead_capture_result.get("loan_data", input_data)
+            self.loan_number = lead_capture_result.get("loan_number")
+            analysis_result = lead_capture_result.get("analysis", {})
+
+            workflow.logger.info("Lead Capture completed with AI recommendation: %s", ai_recommendation)
+            self._add_log("Lead Capture", f"Phase completed. AI Recommendation: {ai_recommendation}")
+
+            # Persist analysis results to SQL for frontend display
+            if analysis_result:
+                metadata_update = {
+                    "analysis": analysis_result,
+                    "ai_recommendation": ai_recommendation,
+                    "loan_number": self.loan_number
+                }
+                await workflow.execute_activity(
+                    update_loan_metadata,
+                    args=[workflow.info().workflow_id, metadata_update],
+                    start_to_close_timeout=timedelta(seconds=30)
+                )
+                workflow.logger.info("Analysis results persisted to SQL")
+                self._add_log("CEO", f"AI Analysis: verified_income=${analysis_result.get('verified_income', 0):,}, mismatch={analysis_result.get('income_mismatch', False)}")
+
+        if phase != "underwriting":
+            self._add_log("CEO", "Waiting for human approval...")
+
+            # =========================================
+            # THE GATE: Wait for human approval signal
+            # This is the ONLY place where we wait for human decision
+            # =========================================
+            workflow.logger.info("CEO: Waiting for human approval signal...")
+            await workflow.wait_condition(
+                lambda: self._decided
+                or workflow.info().get_current_history_length() > HISTORY_COMPACTION_THRESHOLD
+            )
 
-        processing_result = await workflow.execute_child_workflow(
-            ProcessingWorkflow.run,
-            args=[self.loan_data],  # Pass current loan_data with any updates
-            id=f"{workflow.info().workflow_id}-processing",
-            retry_policy=RetryPolicy(maximum_attempts=1)
-        )
+            if not self._decided:
+                if workflow.patched("approval-gate-compaction"):
+                    # Many update_field signals and still no decision: carry only the
+                    # latest state into a fresh run so replay cost stays bounded
+                    workflow.continue_as_new({
+                        **input_data,
+                        RESUME_KEY: self._resume_snapshot("approval", analysis_result),
+                    })
+                # Runs started before compaction existed keep waiting in place
+                await workflow.wait_condition(lambda: self._decided)
+
+            workflow.logger.info("CEO received human decision: %s", self.human_decision)
+            self._add_log("Human Manager", f"Decision: {self.human_decision}")
+
+            self._flush_field_updates()
+
+            # Check: If rejected, archive and end
+            if self.human_decision == "REJECTED":
+                self.current_stage = LoanStage.ARCHIVED.value
+                self.decision_reason = "Rejected by human manager"
+                self._add_log("CEO", "Application REJECTED - Moving to Archive")
+                return "REJECTED"
+
+            # =========================================
+            # Phase 2: Processing (Transition on Approval)
+            # Pass the loan_data (includes any manager field updates)
+            # =========================================
+            self.current_stage = TRANSITIONS[self.current_stage]
+            self._add_log("CEO", "Human APPROVED - Delegating to Processing Department")
+
+            processing_result = await workflow.execute_child_workflow(
+                ProcessingWorkflow.run,
+                args=[self.loan_data],  # Pass current loan_data with any updates
+                id=f"{workflow.info().workflow_id}-processing",
+                retry_policy=RetryPolicy(maximum_attempts=1)
+            )
 
-        workflow.logger.info(f"Processing completed with: {processing_result}")
-        self._add_log("Processing", f"Phase completed: {processing_result}")
+            workflow.logger.info("Processing completed with: %s", processing_result)
+            self._add_log("Processing", f"Phase completed: {processing_result}")
+
+            # Phase boundary: start the long underwriting/signature waits from a
+            # compact history if the earlier phases left a large one (new runs
+            # only; older histories recorded the underwriting writes here)
+            if (
+                workflow.info().get_current_history_length() > PHASE_COMPACTION_THRESHOLD
+                and workflow.patched("phase-compaction")
+            ):
+                workflow.continue_as_new({
+                    **input_data,
+                    RESUME_KEY: self._resume_snapshot("underwriting", analysis_result),
+                })
 
         # =========================================
         # Underwriting Decision Gate (Waiter Pattern)
         # Wait for human underwriter to approve/reject the application
         # =========================================
-        self.current_stage = LoanStage.UNDERWRITING
+        self.current_stage = TRANSITIONS[self.current_stage]
         self._add_log("CEO", "Waiting for underwriting decision...")
 
-        # Update legacy Application table
-        await workflow.execute_activity(
-            update_loan_metadata,
-            args=[workflow.info().workflow_id, {
-                "status": "Pending Underwriting Decision",
-                "loan_stage": LoanStage.UNDERWRITING.value
-            }],
-            start_to_close_timeout=timedelta(seconds=30)
-        )
-
-        # Update LoanApplication table with LOCKED state (Waiter Pattern)
-        await workflow.execute_activity(
-            update_loan_status,
-            args=[
-                workflow.info().workflow_id,
-                "Pending Underwriting Decision",
-                LoanStage.UNDERWRITING.value,
-                True  # is_locked = True (waiting for human)
-            ],
-            start_to_close_timeout=timedelta(seconds=30)
+        # The two tables are independent, so both writes run concurrently
+        await _run_writes(
+            # Update legacy Application table
+            lambda: workflow.execute_activity(
+                update_loan_metadata,
+                args=[workflow.info().workflow_id, {
+                    "status": "Pending Underwriting Decision",
+                    "loan_stage": LoanStage.UNDERWRITING.value
+                }],
+                start_to_close_timeout=timedelta(seconds=30)
+            ),
+            # Update LoanApplication table with LOCKED state (Waiter Pattern)
+            lambda: workflow.execute_activity(
+                update_loan_status,
+                args=[
+                    workflow.info().workflow_id,
+                    "Pending Underwriting Decision",
+                    LoanStage.UNDERWRITING.value,
+                    True  # is_locked = True (waiting for human)
+                ],
+                start_to_close_timeout=timedelta(seconds=30)
+            ),
         )
         self._add_log("Database", "Application LOCKED - Awaiting human underwriting decision")
 
@@ -319,13 +463,13 @@ class LoanLifecycleWorkflow:
         if not underwriting_wait_result:
             workflow.logger.warning("CEO: Underwriting decision timed out after 7 days")
             self._add_log("CEO", "Underwriting decision TIMED OUT - Application withdrawn")
-            self.current_stage = LoanStage.ARCHIVED
+            self.current_stage = LoanStage.ARCHIVED.value
             self.decision_reason = "Underwriting decision timed out - application withdrawn"
 
             await workflow.execute_activity(
                 update_loan_metadata,
                 args=[workflow.info().workflow_id, {
-                    "status": "Withdrawn (Timeout)",
+                    "status": TERMINAL_STATUS["WITHDRAWN"],
                     "loan_stage": LoanStage.ARCHIVED.value,
                     "final_status": "WITHDRAWN"
                 }],
@@ -334,7 +478,7 @@ class LoanLifecycleWorkflow:
 
             return "WITHDRAWN"
 
-        workflow.logger.info(f"CEO received underwriting decision: {self.underwriting_decision}")
+        workflow.logger.info("CEO received underwriting decision: %s", self.underwriting_decision)
         self._add_log("Underwriter", f"Decision: {self.underwriting_decision.upper()} - {self.underwriting_decision_reason}")
 
         # Save underwriting decision to database (Waiter Pattern)
@@ -352,14 +496,14 @@ class LoanLifecycleWorkflow:
 
         # Check: If rejected, archive and end
         if self.underwriting_decision == "rejected":
-            self.current_stage = LoanStage.ARCHIVED
+            self.current_stage = LoanStage.ARCHIVED.value
             self.decision_reason = f"Rejected by underwriter: {self.underwriting_decision_reason}"
             self._add_log("CEO", "Application REJECTED by underwriter - Moving to Archive")
 
             await workflow.execute_activity(
                 update_loan_metadata,
                 args=[workflow.info().workflow_id, {
-                    "status": "Rejected by Underwriter",
+                    "status": TERMINAL_STATUS["REJECTED"],
                     "loan_stage": LoanStage.ARCHIVED.value,
                     "final_status": "REJECTED",
                     "rejection_reason": self.underwriting_decision_reason
@@ -374,23 +518,29 @@ class LoanLifecycleWorkflow:
         # =========================================
         # Signature Gate: Wait for Borrower to Sign Disclosures
         # =========================================
-        self.current_stage = LoanStage.UNDERWRITING  # Reusing UNDERWRITING as "Waiting for Signature"
-        self._add_log("CEO", "Initial Disclosures generated - Waiting for borrower signature")
-
-        # Update SQL status AND loan_stage to show waiting for signature
-        # CRITICAL: These special keys are extracted by update_loan_metadata and written to SQL columns
-        await workflow.execute_activity(
-            update_loan_metadata,
-            args=[workflow.info().workflow_id, {
-                "status": "Waiting for Signature",
-                "loan_stage": LoanStage.UNDERWRITING.value
-            }],
-            start_to_close_timeout=timedelta(seconds=30)
-        )
+        # Stage stays at UNDERWRITING while waiting for the signature.
+        # Disclosures exist from Processing onward, so the borrower may sign
+        # while underwriting review is still pending; in that case the gate
+        # is already open and the "Waiting for Signature" update is skipped.
+        # Runs started before the patch always scheduled the update, so their
+        # histories replay through the original path.
+        if not self.borrower_signed or not workflow.patched("signature-early-skip"):
+            self._add_log("CEO", "Initial Disclosures generated - Waiting for borrower signature")
+
+            # Update SQL status AND loan_stage to show waiting for signature
+            # CRITICAL: These special keys are extracted by update_loan_metadata and written to SQL columns
+            await workflow.execute_activity(
+                update_loan_metadata,
+                args=[workflow.info().workflow_id, {
+                    "status": "Waiting for Signature",
+                    "loan_stage": LoanStage.UNDERWRITING.value
+                }],
+                start_to_close_timeout=timedelta(seconds=30)
+            )
 
-        workflow.logger.info("CEO: Waiting for borrower signature...")
+            workflow.logger.info("CEO: Waiting for borrower signature...")
 
-        await workflow.wait_condition(lambda: self.borrower_signed is True)
+            await workflow.wait_condition(lambda: self.borrower_signed)
 
         workflow.logger.info("CEO: Borrower signature received!")
         self._add_log("Borrower", "Documents signed by borrower")
@@ -402,6 +552,7 @@ class LoanLifecycleWorkflow:
         workflow.logger.info("CEO: Starting underwriting review...")
 
         # Prepare loan data with analysis for underwriting
+        self._flush_field_updates()
         underwriting_input = {
             **self.loan_data,
             "analysis": analysis_result,
@@ -418,7 +569,7 @@ class LoanLifecycleWorkflow:
         self.automated_uw_decision = underwriting_result.get("decision", "REFER_TO_HUMAN")
         self.risk_evaluation = underwriting_result.get("risk_evaluation", {})
 
-        workflow.logger.info(f"Underwriting completed with decision: {self.automated_uw_decision}")
+        workflow.logger.info("Underwriting completed with decision: %s", self.automated_uw_decision)
         self._add_log("Underwriting", f"Decision: {self.automated_uw_decision}")
 
         # Persist underwriting results to SQL (including status update)
@@ -441,12 +592,11 @@ class LoanLifecycleWorkflow:
         # =========================================
         # Phase 4: Closing
         # =========================================
+        self.current_stage = TRANSITIONS[self.current_stage]
         if self.automated_uw_decision == "CLEAR_TO_CLOSE":
-            self.current_stage = LoanStage.CLOSING
             self._add_log("CEO", "CLEAR TO CLOSE - Moving to closing phase")
             workflow.logger.info("CEO: Loan is Clear to Close!")
         else:
-            self.current_stage = LoanStage.CLOSING
             self._add_log("CEO", "Moving to closing with conditions")
             workflow.logger.info("CEO: Moving to closing with conditions")
 
@@ -460,80 +610,92 @@ class LoanLifecycleWorkflow:
             start_to_close_timeout=timedelta(seconds=30)
         )
 
-        # Generate Final Approval Letter
-        workflow.logger.info("CEO: Generating Final Approval Letter...")
-        self._add_log("DocGen MCP", "Generating Final Approval Letter...")
-
+        # The approval letter's only consumer is the congratulations email,
+        # so both are skipped when there is no address to send to. Runs
+        # started before the skip generated the letter regardless and replay
+        # that way.
+        self._flush_field_updates()
         applicant_info = self.loan_data.get("applicant_info", {})
-        doc_data = {
-            "workflow_id": workflow.info().workflow_id,
-            "name": applicant_info.get("name", applicant_name),
-            "email": applicant_info.get("email", ""),
-            "property_value": self.loan_data.get("property_value", 0),
-            "down_payment": self.loan_data.get("down_payment", 0),
-            "loan_amount": self.loan_data.get("loan_amount", 0),
-            "rate": 6.5,
-            "term": 30
-        }
-
-        approval_doc = await workflow.execute_activity(
-            generate_document,
-            args=["Final Approval Letter", doc_data, {}],
-            start_to_close_timeout=timedelta(seconds=60)
-        )
-
-        workflow.logger.info(f"Final Approval Letter generated: {approval_doc.get('public_url')}")
-        self._add_log("DocGen MCP", f"Final Approval Letter generated: {approval_doc.get('public_url')}")
-
-        # Send congratulations email
         applicant_email = applicant_info.get("email", "")
-        if applicant_email:
-            workflow.logger.info("CEO: Sending congratulations email...")
-            self._add_log("Comms MCP", "Sending congratulations notification...")
+        funded_status = TERMINAL_STATUS["COMPLETED"]
+
+        if applicant_email or not workflow.patched("skip-notification-without-email"):
+            # Generate Final Approval Letter
+            workflow.logger.info("CEO: Generating Final Approval Letter...")
+            self._add_log("DocGen MCP", "Generating Final Approval Letter...")
+
+            doc_data = DOC_DEFAULTS | {
+                "workflow_id": workflow.info().workflow_id,
+                "name": applicant_info.get("name", applicant_name),
+                "email": applicant_email,
+                "property_value": self.loan_data.get("property_value", 0),
+                "down_payment": self.loan_data.get("down_payment", 0),
+                "loan_amount": self.loan_data.get("loan_amount", 0),
+            }
 
-            await workflow.execute_activity(
-                send_email,
-                args=["loan_funded", applicant_email, {
-                    "name": applicant_info.get("name", applicant_name),
-                    "loan_amount": self.loan_data.get("loan_amount", 0),
-                    "approval_letter_url": approval_doc.get("public_url"),
-                    "subject": "Congratulations! Your Loan is Funded"
-                }],
-                start_to_close_timeout=timedelta(seconds=30)
+            approval_doc = await workflow.execute_activity(
+                generate_document,
+                args=["Final Approval Letter", doc_data, {}],
+                start_to_close_timeout=timedelta(seconds=60)
             )
 
-            workflow.logger.info(f"Congratulations email sent to {applicant_email}")
-            self._add_log("Comms MCP", f"Email sent to {applicant_email}: Congratulations! Your loan is funded")
+            approval_url = approval_doc.get("public_url")
+            msg = f"Final Approval Letter generated: {approval_url}"
+            workflow.logger.info(msg)
+            self._add_log("DocGen MCP", msg)
+
+            if applicant_email:
+                # Send congratulations email
+                workflow.logger.info("CEO: Sending congratulations email...")
+                self._add_log("Comms MCP", "Sending congratulations notification...")
+
+                await workflow.execute_activity(
+                    send_email,
+                    args=["loan_funded", applicant_email, {
+                        "name": applicant_info.get("name", applicant_name),
+                        "loan_amount": self.loan_data.get("loan_amount", 0),
+                        "approval_letter_url": approval_url,
+                        "subject": "Congratulations! Your Loan is Funded"
+                    }],
+                    start_to_close_timeout=timedelta(seconds=30)
+                )
+
+                workflow.logger.info("Congratulations email sent to %s", applicant_email)
+                self._add_log("Comms MCP", f"Email sent to {applicant_email}: Congratulations! Your loan is funded")
+        else:
+            funded_status = "Funded (no notification)"
+            self._add_log("CEO", "No applicant email on file - skipping approval letter and notification")
 
         # =========================================
         # Final: Archive Completed Loan
         # =========================================
-        self.current_stage = LoanStage.ARCHIVED
+        self.current_stage = TRANSITIONS[self.current_stage]
         self._add_log("CEO", "Loan lifecycle COMPLETED - Archiving")
 
-        # Final status update - persist to legacy Application table
-        await workflow.execute_activity(
-            update_loan_metadata,
-            args=[workflow.info().workflow_id, {
-                "status": "Funded",
-                "loan_stage": LoanStage.ARCHIVED.value,
-                "final_status": "COMPLETED",
-                "underwriting_decision": self.automated_uw_decision
-            }],
-            start_to_close_timeout=timedelta(seconds=30)
-        )
-
-        # Finalize LoanApplication record (Waiter Pattern)
-        await workflow.execute_activity(
-            finalize_loan_record,
-            args=[
-                workflow.info().workflow_id,
-                "Funded",
-                LoanStage.ARCHIVED.value
-            ],
-            start_to_close_timeout=timedelta(seconds=30)
+        await _run_writes(
+            # Final status update - persist to legacy Application table
+            lambda: workflow.execute_activity(
+                update_loan_metadata,
+                args=[workflow.info().workflow_id, {
+                    "status": funded_status,
+                    "loan_stage": LoanStage.ARCHIVED.value,
+                    "final_status": "COMPLETED",
+                    "underwriting_decision": self.automated_uw_decision
+                }],
+                start_to_close_timeout=timedelta(seconds=30)
+            ),
+            # Finalize LoanApplication record (Waiter Pattern)
+            lambda: workflow.execute_activity(
+                finalize_loan_record,
+                args=[
+                    workflow.info().workflow_id,
+                    TERMINAL_STATUS["COMPLETED"],
+                    LoanStage.ARCHIVED.value
+                ],
+                start_to_close_timeout=timedelta(seconds=30)
+            ),
         )
         self._add_log("Database", "Loan record finalized - Status: Funded")
 
-        workflow.logger.info(f"CEO Workflow completed for {applicant_name}")
+        workflow.logger.info("CEO Workflow completed for %s", applicant_name)
         return "COMPLETED"
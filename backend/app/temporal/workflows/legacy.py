@@ -1,18 +1,35 @@
 import asyncio 
 from datetime import timedelta
 from temporalio import workflow
+from temporalio.common import RetryPolicy
 from temporalio.exceptions import ApplicationError
 
 # Use absolute import for sibling package
-from app.temporal.activities import analyze_document, read_pdf_content, send_email_mock, organize_files
+from app.temporal.activities import analyze_document, extract_credit_score, read_pdf_content, send_email_mock, organize_files
 # LoanData was likely defined in the old activities file, so we import it from there too
 from app.temporal.activities.legacy import LoanData
+
+# Bounded retries instead of the default (unlimited) policy, so a stuck
+# LLM/PDF call fails the run in minutes rather than holding it for hours
+ACTIVITY_RETRY_POLICY = RetryPolicy(
+    maximum_attempts=3,
+    initial_interval=timedelta(seconds=2),
+    maximum_interval=timedelta(seconds=30),
+)
+
 @workflow.defn
 class LoanProcessWorkflow:
     def __init__(self) -> None:
         self.is_approved = None 
         self.status = "Started"
-        self.data = None 
+        # Loan data is kept as separate fields and only assembled for the
+        # get_loan_data query; the workflow input itself is never mutated
+        self.input_data = None
+        self.file_paths = None
+        self.audit_result = None
+        self.verify_result = None
+        self.verification = None
+        self.is_waiting = False
         self.logs = [] # 🔹 NEW: Central Log Store
 
     @workflow.signal
@@ -28,7 +45,17 @@ class LoanProcessWorkflow:
 
     @workflow.query
     def get_loan_data(self) -> dict:
-        return self.data
+        if self.file_paths is None:
+            return None
+        data = {**self.input_data, "file_paths": self.file_paths}
+        if self.audit_result is not None:
+            data['ai_analysis'] = {
+                "financial_audit": self.audit_result,
+                "identity_verification": self.verify_result
+            }
+        if self.verification is not None:
+            data['verification'] = self.verification
+        return data
     
     @workflow.query
     def get_logs(self) -> list:
@@ -47,8 +74,15 @@ class LoanProcessWorkflow:
 
     @workflow.run
     async def run(self, input_data: dict) -> str:
-        workflow.logger.info(f"Workflow started for {input_data['applicant_info']['name']}")
+        workflow.logger.info("Workflow started for %s", input_data['applicant_info']['name'])
         self._add_log("System", "start", "Application received and workflow started.")
+
+        # Validate once up front: a bad value fails the run instead of
+        # failing (and retrying) a workflow task at the synthesis step
+        try:
+            stated_income = float(input_data['applicant_info']['stated_income'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ApplicationError(f"Invalid stated_income: {e}", non_retryable=True)
         
         # --- Step 1: File Clerk ---
         self.status = "File Clerk: Organizing Documents..."
@@ -56,72 +90,110 @@ class LoanProcessWorkflow:
         cleaned_file_paths = await workflow.execute_activity(
             organize_files,
             args=[input_data['applicant_info']['name'], input_data['file_paths']],
-            start_to_close_timeout=timedelta(seconds=10)
+            start_to_close_timeout=timedelta(seconds=10),
+            retry_policy=ACTIVITY_RETRY_POLICY
         )
         self._add_log("Agent 0 (File Clerk)", "init_loan_folder", "Created secure folder structure for applicant documents.")
         
-        self.data = input_data
-        self.data['file_paths'] = cleaned_file_paths
-        
-        # --- Step 2: Analysts ---
-        self.status = "Agents: Analyzing Documents in Parallel..."
+        self.input_data = input_data
+        self.file_paths = cleaned_file_paths
         
-        async def job_auditor():
-            if 'tax_document' not in cleaned_file_paths:
-                return LoanData(applicant_name="Unknown", missing_docs=["Tax Return"])
-
+        async def read_document(key: str, label: str):
+            if key not in cleaned_file_paths:
+                return None
             text = await workflow.execute_activity(
-                read_pdf_content, args=[cleaned_file_paths['tax_document']], 
-                start_to_close_timeout=timedelta(seconds=20)
+                read_pdf_content, args=[cleaned_file_paths[key]],
+                start_to_close_timeout=timedelta(seconds=20),
+                retry_policy=ACTIVITY_RETRY_POLICY
             )
-            self._add_log("Agent 1 (OCR)", "read_pdf_content", "Extracted text content from Tax Return.")
-            
-            result = await workflow.execute_activity(
-                analyze_document, args=[text, "financial_auditor"],
-                start_to_close_timeout=timedelta(minutes=1)
+            self._add_log("Agent 1 (OCR)", "read_pdf_content", f"Extracted text content from {label}.")
+            return text
+
+        async def analyze(text: str, role: str) -> LoanData:
+            return await workflow.execute_activity(
+                analyze_document, args=[text, role],
+                start_to_close_timeout=timedelta(minutes=1),
+                heartbeat_timeout=timedelta(seconds=30),
+                retry_policy=ACTIVITY_RETRY_POLICY
             )
+
+        async def job_auditor(tax_read):
+            text = await tax_read
+            if text is None:
+                return LoanData(applicant_name="Unknown", missing_docs=["Tax Return"])
+
+            result = await analyze(text, "financial_auditor")
             self._add_log("Agent 2 (Analyst)", "analyze_document", "Performed Financial Audit on Tax Return.")
             return result
 
-        async def job_verifier():
-            if 'credit_document' not in cleaned_file_paths:
+        async def job_verifier(credit_read):
+            credit_text = await credit_read
+            if credit_text is None:
                  return LoanData(applicant_name="Unknown", missing_docs=["Credit Report"])
 
-            credit_text = await workflow.execute_activity(
-                read_pdf_content, args=[cleaned_file_paths['credit_document']],
-                start_to_close_timeout=timedelta(seconds=20)
-            )
-            self._add_log("Agent 1 (OCR)", "read_pdf_content", "Extracted text content from Credit Report.")
-
-            result = await workflow.execute_activity(
-                analyze_document, args=[credit_text, "identity_verifier"],
-                start_to_close_timeout=timedelta(minutes=1)
-            )
+            result = await analyze(credit_text, "identity_verifier")
             self._add_log("Agent 3 (Risk)", "check_credit_score", "Checked internal credit guidelines.")
             return result
-            
-        results = await asyncio.gather(job_auditor(), job_verifier())
-        audit_result, verify_result = results[0], results[1]
+
+        try:
+            if workflow.patched("credit-gate"):
+                # --- Step 2: Credit Gate ---
+                # Both reads start together; a low score rejects regardless of
+                # the financial audit, so only the LLM analysts wait on it
+                credit_read = asyncio.create_task(read_document('credit_document', "Credit Report"))
+                tax_read = asyncio.create_task(read_document('tax_document', "Tax Return"))
+
+                self.status = "Agent 3 (Risk): Checking Credit Score..."
+                credit_text = await credit_read
+                if credit_text is not None:
+                    fast_credit_score = await workflow.execute_local_activity(
+                        extract_credit_score, args=[credit_text],
+                        start_to_close_timeout=timedelta(seconds=5)
+                    )
+                    if fast_credit_score is not None and fast_credit_score < 620:
+                        tax_read.cancel()
+                        self.verification = {"credit_score": fast_credit_score}
+                        self.status = "Auto-Rejected (Low Credit)"
+                        self._add_log("System", "decision", f"Auto-Rejected due to low credit score ({fast_credit_score}).")
+                        return "Rejected"
+
+                # --- Step 3: Analysts ---
+                self.status = "Agents: Analyzing Documents in Parallel..."
+                audit_result, verify_result = await asyncio.gather(
+                    job_auditor(tax_read), job_verifier(credit_read)
+                )
+            else:
+                # Runs started before the credit gate: each analyst reads its
+                # own document, in the order their histories recorded
+                self.status = "Agents: Analyzing Documents in Parallel..."
+                audit_result, verify_result = await asyncio.gather(
+                    job_auditor(read_document('tax_document', "Tax Return")),
+                    job_verifier(read_document('credit_document', "Credit Report")),
+                )
+        except Exception:
+            # Surface the failure on the dashboard before failing the run
+            self.status = "Analysis Failed"
+            self._add_log("System", "error", "Document analysis failed.")
+            raise
         
-        self.data['ai_analysis'] = {
-            "financial_audit": audit_result,
-            "identity_verification": verify_result
-        }
+        self.audit_result = audit_result
+        self.verify_result = verify_result
         
-        # --- Step 3: Synthesis ---
-        stated_income = float(input_data['applicant_info']['stated_income'])
-        verified_income = float(audit_result.annual_income)
+        # --- Step 4: Synthesis ---
+        verified_income = audit_result.annual_income
         credit_score = verify_result.credit_score
-        income_match = abs(stated_income - verified_income) < 5000
+        # Within 5% of stated income (the old flat $5,000 was too loose for
+        # small incomes and too strict for large ones)
+        income_match = abs(stated_income - verified_income) / max(stated_income, 1.0) < 0.05
         
-        self.data['verification'] = {
+        self.verification = {
             "stated_income": stated_income,
             "verified_income": verified_income,
             "income_match": income_match,
             "credit_score": credit_score
         }
         
-        # --- Step 4: Logic Gates ---
+        # --- Step 5: Logic Gates ---
         if credit_score < 620:
             self.status = "Auto-Rejected (Low Credit)"
             self._add_log("System", "decision", f"Auto-Rejected due to low credit score ({credit_score}).")
@@ -141,7 +213,19 @@ class LoanProcessWorkflow:
         self.is_waiting = True
         self._add_log("System", "wait", "Application queued for Manager Review.")
         
-        await workflow.wait_condition(lambda: not self.is_waiting)
+        # Bounded so an unanswered review doesn't pin the workflow forever.
+        # The timeout adds a timer command, so runs already parked here
+        # before it existed keep the untimed wait.
+        if workflow.patched("review-timeout"):
+            try:
+                await workflow.wait_condition(lambda: not self.is_waiting, timeout=timedelta(days=7))
+            except asyncio.TimeoutError:
+                self.is_waiting = False
+                self.status = "Auto-Rejected (Review Timeout)"
+                self._add_log("System", "decision", "Auto-Rejected: no manager decision within 7 days.")
+                return "Rejected"
+        else:
+            await workflow.wait_condition(lambda: not self.is_waiting)
         
         if self.is_approved:
             return "Approved"